@@ -0,0 +1,303 @@
+# Allowed values per column for the service code file
+ALLOWED_SETS = {
+    "Unit_of_Measurement__c": [
+        "Each",
+        "Flat",
+        "Bin",
+        "Bulk",
+        "Case",
+        "Combo",
+        "Container",
+        "Dolly",
+        "Drum",
+        "LBs - Gross",
+        "LBs - Net",
+        "Hour",
+        "Hundred Weight Lbs - Gross",
+        "Hundred Weight Lbs - Net",
+        "Kilogram - Gross",
+        "Kilogram - Net",
+        "Hundred Kilogram - Gross",
+        "Hundred Kilogram - Net",
+        "Kilowatt Hour",
+        "Load",
+        "Lot",
+        "Pallet",
+        "Railcar",
+        "Square Foot",
+        "Square Meter",
+        "Tote",
+        "Truck",
+        "Trailer",
+        "Tub",
+        "CWT",
+        "Metric Ton"
+    ],
+    "lcpq_Invoice_Type_Code__c": ["WR", "AN", "RN"],
+    "lcpq_Rebill_Passthrough_Service__c": ["No", "Cost", "Cost + Markup"],
+    "lcpq_Standard_vs_Non_Standard_UOM__c": ["Standard", "Non-Standard"],
+    "lcpq_Service_Code_Categorization__c": [
+        "API Name",
+        "Standard",
+        "Standard, Approval Required",
+        "Legacy",
+    ],
+    "Charge_Break_Flag__c": ["F", "B", "C"],
+    "Charge_Type_Code__c": [
+        "CIO",
+        "DAVM",
+        "DAVS",
+        "DENS",
+        "MAXD",
+        "MAXX",
+        "MULT",
+        "MXCX",
+        "NC",
+        "SING",
+    ],
+    "lcpq_Catalog_Category__c": [
+        "Storage & Handling",
+        "Accessorials",
+        "Storage & Handling for Density",
+        "Boxing Services",
+        "Revenue Override",
+        "Storage & Handling for PNW",
+        "Storage & Handling for Vernon",
+    ],
+    "lcpq_DG_Boxing_Defrost_Language__c": [True, False],
+    "lcpq_Exclude_from_Documents__c": [True, False],
+    "lcpq_Rollup_Category__c": [
+        "Storage",
+        "Handling",
+        "Accessorial",
+        "Blast Freeze",
+        "Case Pick",
+        "Floor Loading",
+        "Floor Unloading",
+        "Shrink Wrap",
+    ],
+    "lcpq_Subcategory__c": [
+        "Accessorial",
+        "Blast Freeze",
+        "Case Pick",
+        "Handling",
+        "Storage",
+    ],
+    "SBQQ__SubscriptionPricing__c": ["Fixed Price"],
+}
+
+# Facility IDs that receive tariff rates
+FACILITY_IDS = (
+    "a070c000010atetAAA",
+    "a070c0000126ImAAAU",
+    "a07a000000pUc3aAAC",
+    "a07a000000zT7E6AAK",
+    "a074Q000016aPxdQAE",
+    "a07a000000pUc4OAAS",
+    "a070c0000126LjKAAU",
+    "a070c0000126LToAAM",
+    "a070c000012Ld1NAAS",
+    "a070c0000126ImKAAU",
+    "a0730000002ZlFLAA0",
+    "a070c0000126InSAAU",
+    "a074Q000012LdF7QAK",
+    "a074Q00001727N0QAI",
+    "a07a000000zSbkrAAC",
+    "a070c0000126ImjAAE",
+    "a074Q000012DXfCQAW",
+    "a074Q000017265JQAQ",
+    "a07a000000pUc4GAAS",
+    "a070c0000126IpJAAU",
+    "a070c0000126IncAAE",
+    "a070c0000126ImUAAU",
+    "a07a000000pUc4SAAS",
+    "a074Q000018Igm5QAC",
+    "a07a000000pUc4UAAS",
+    "a070c000012Ld1cAAC",
+    "a070c0000126IoGAAU",
+    "a070c0000126In3AAE",
+    "a070c0000126ImeAAE",
+    "a07a000000pUc3vAAC",
+    "a074Q000014jzPWQAY",
+    "a07a000000pUc3kAAC",
+    "a0730000002YvtpAAC",
+    "a07a000000pUc3mAAC",
+    "a074Q000012LdDAQA0",
+    "a07a000000pUc3oAAC",
+    "a070c00000ejkQQAAY",
+    "a073000000TTMnyAAH",
+    "a0730000002Yvu7AAC",
+    "a074Q000014knShQAI",
+    "a074Q000017j71AQAQ",
+    "a07a000000pUc3dAAC",
+    "a074Q000013mvrSQAQ",
+    "a074Q000017jlESQAY",
+    "a0730000002YvtnAAC",
+    "a070c0000126Io1AAE",
+    "a074Q00001A27k4QAB",
+    "a07a000000pUc4HAAS",
+    "a070c0000126ImoAAE",
+    "a074Q000012DXgsQAG",
+    "a07a000000pUc42AAC",
+    "a074Q000013mvrXQAQ",
+    "a070c0000126IofAAE",
+    "a070c0000126Ip9AAE",
+    "a0730000002YvtxAAC",
+    "a070c000011M0WFAA0",
+    "a0730000002YvtwAAC",
+    "a074Q000014n4pHQAQ",
+    "a07a000000zT7DXAA0",
+    "a070c0000126IouAAE",
+    "a0730000002YvtqAAC",
+    "a0730000002YvttAAC",
+    "a0730000002ZlFMAA0",
+    "a07a000000pUc3jAAC",
+    "a074Q000014n4usQAA",
+    "a07a000000pUc3tAAC",
+    "a070c0000126L3uAAE",
+    "a073000000QaciTAAR",
+    "a074Q000014kwKDQAY",
+    "a070c0000126Ip4AAE",
+    "a0730000002YvtyAAC",
+    "a070c0000126Kn8AAE",
+    "a0730000002YvtlAAC",
+    "a074Q000014lTrMQAU",
+    "a070c0000126IopAAE",
+    "a070c000010bJPTAA2",
+    "a070c0000126ImFAAU",
+    "a070c000010bJPOAA2",
+    "a070c0000126ImyAAE",
+    "a07a000000pUc49AAC",
+    "a07a000000pUc4QAAS",
+    "a070c0000126In8AAE",
+    "a074Q000016aGcHQAU",
+    "a07a000000pUc3nAAC",
+    "a07a000000pUc47AAC",
+    "a070c0000126IokAAE",
+    "a0730000002YvtoAAC",
+    "a074Q000017inilQAA",
+    "a070c0000126ImPAAU",
+    "a0730000002Yvu9AAC",
+    "a07a000000pUc44AAC",
+    "a070c0000126ImtAAE",
+    "a0730000002YvtrAAC",
+    "a0730000002Yvu0AAC",
+    "a0730000002YvtmAAC",
+    "a070c0000126Io6AAE",
+    "a0730000002Yvu6AAC",
+    "a0730000002Yvu2AAC",
+    "a074Q000014n4upQAA",
+    "a070c000010b3YkAAI",
+    "a0730000002ZlFRAA0",
+    "a0730000002Yvu3AAC",
+    "a074Q000012DXh7QAG",
+    "a070c0000126InhAAE",
+    "a07a000000qZieYAAS",
+    "a070c0000126IpOAAU",
+    "a0730000002YvtuAAC",
+    "a074Q000014k5yXQAQ",
+    "a07a000000pUc3zAAC",
+    "a070c0000126Im5AAE",
+    "a07a000000pUc3xAAC",
+    "a0730000002YvtsAAC",
+    "a070c0000126IoLAAU",
+    "a074Q00001727NEQAY",
+    "a07a000000pUZCeAAO",
+    "a07a000000pUc4MAAS",
+    "a07a000000pUc3iAAC",
+    "a070c0000126InNAAU",
+    "a074Q00001720opQAA",
+    "a0730000002YvtzAAC",
+    "a070c000012LcNEAA0",
+    "a070c0000126IozAAE",
+    "a074Q000012LdC6QAK",
+    "a070c0000126IoBAAU",
+    "a0730000002Yvu5AAC",
+    "a070c0000126IpEAAU",
+    "a07a000000pUc48AAC",
+    "a070c000012LcNJAA0",
+    "a0730000002ZlFSAA0",
+    "a0730000002ZlFVAA0",
+    "a0730000002YvuAAAS",
+    "a07a000000zT7E1AAK",
+    "a070c0000126ImZAAU",
+    "a07a000000pUc43AAC",
+    "a07a000000pUc4VAAS",
+    "a070c0000126Im0AAE",
+    "a07a000000pUc4CAAS",
+    "a070c0000126IoVAAU",
+    "a074Q000014n4ulQAA",
+    "a070c000010b3TqAAI",
+    "a07a000000pUc3yAAC",
+    "a07a000000pUc40AAC",
+    "a070c0000126LTtAAM",
+    "a074Q00001A27jtQAB",
+    "a07a000000pUc4WAAS",
+    "a07a000000pUc45AAC",
+    "a07a000000pUc4PAAS",
+    "a074Q000014lTrWQAU",
+    "a07a000000zT7ELAA0",
+    "a070c0000126KmyAAE",
+    "a070c0000126IoaAAE",
+    "a07a000000pUc46AAC",
+    "a070c0000126InIAAU",
+    "a07a000000zT7DhAAK",
+    "a07a000000qaIGBAA2",
+    "a070c0000126IpTAAU",
+    "a07a000000qZXLdAAO",
+    "a0730000003II1FAAW",
+    "a0730000002Yvu4AAC",
+    "a07a000000pUc4TAAS",
+    "a07a000000pUc3lAAC",
+    "a070c000010bJPJAA2",
+    "a070c000010bJOQAA2",
+    "a074Q000017ingfQAA",
+    "a074Q000014lTrgQAE",
+    "a074Q000017jnaFQAQ",
+    "a074Q0000171nLnQAI",
+    "a070c000010bJNwAAM",
+    "a070c000010bJO6AAM",
+    "a070c000010bJO1AAM",
+    "a070c000010bJNrAAM",
+    "a074Q000018HmlEQAS",
+    "a074Q000018Hml4QAC",
+    "a074Q000018HmkpQAC",
+    "a074Q000018HmkzQAC",
+    "a074Q000012DXgRQAW",
+    "a074Q000012DXfnQAG",
+    "a074Q00001720p4QAA",
+    "a074Q00001720p5QAA",
+    "a074Q00001720nnQAA",
+    "a074Q00001720nmQAA",
+    "a074Q000012DXfsQAG",
+    "a074Q00001720pTQAQ",
+    "a074Q000012DXhMQAW",
+    "a074Q000012DXhHQAW",
+    "a074Q00001AzOn0QAF",
+    "a074Q00001A27k9QAB",
+    "a074Q00001A27kBQAR",
+    "a074Q00001A27kDQAR",
+    "a074Q000012DXhRQAW",
+    "a074Q000012DXh2QAG",
+    "a074Q000012DXhCQAW",
+    "a074Q00001727N9QAI",
+    "a074Q000012DXgnQAG",
+    "a074Q000012DXgxQAG",
+    "a070c0000126Kn3AAE",
+    "a074Q00001727MfQAI",
+    "a074Q00001727MzQAI",
+    "a07a000000zSbjFAAS",
+    "a070c000012Ld1SAAS",
+    "a070c000012Ld1XAAS",
+    "a074Q000014n4uqQAA",
+    "a074Q00001727JMQAY",
+    "a074Q000013owk2QAA",
+    "a074Q000013owjxQAA",
+    "a070c0000126JRdAAM",
+    "a070c000011M0cSAAS",
+    "a074Q000014kvkZQAQ",
+    "a070c0000126IoQAAU",
+    "a07a000000pUc41AAC",
+    "a07a000000pUc3eAAC",
+    "a07a000000pUc3gAAC",
+)
@@ -1,36 +1,57 @@
 import streamlit as st
 import pandas as pd
 import os
-from simple_salesforce import Salesforce
-from google.cloud import secretmanager
 import json
-from time import sleep, strftime
-from io import BytesIO
-
-# Buffer to hold the final Excel workbook
-final_excel_buffer = BytesIO()
-excel_writer = pd.ExcelWriter(final_excel_buffer, engine="xlsxwriter")
+from time import strftime
+from constants import ALLOWED_SETS, FACILITY_IDS
+from run_archive import (
+    archive_frame,
+    compact_archive,
+    find_archived_product_codes,
+    index_version,
+    lookup,
+    new_run_id,
+    rollback_ids,
+)
 
 # Define a temporary folder for storing uploaded and generated files
 TEMP_FOLDER = "temp"
 os.makedirs(TEMP_FOLDER, exist_ok=True)
 timestr = strftime("%Y%m%d_%H%M%S_")
 
+
+def save_uploaded_file(uploaded_file, slot):
+    # Streamlit reruns the whole script on every interaction, so only write the
+    # upload to disk once. TEMP_FOLDER is shared by all sessions, so the path is
+    # made unique per upload with its file_id, and the file this session saved
+    # earlier for the same uploader (slot) is removed once it is superseded.
+    path = os.path.join(TEMP_FOLDER, f"{uploaded_file.file_id}_{uploaded_file.name}")
+    saved = st.session_state.setdefault("saved_uploads", {})
+    previous = saved.get(slot)
+    if previous and previous != path and os.path.exists(previous):
+        os.remove(previous)
+    if not os.path.exists(path):
+        with open(path, "wb") as f:
+            f.write(uploaded_file.getbuffer())
+    saved[slot] = path
+    return path
+
+
 # Streamlit UI
 st.title("Salesforce Acquisition Duplicate Processing Tool V2")
 
 # Key uploader
 Key_file = st.file_uploader("📂 Upload Key File", type=["json"])
 
-# Set the path dynamically only after the file is uploaded
+# The key is kept in memory for this session only: it is never written to the
+# shared temp folder or to the process-wide environment
+Key_info = None
 if Key_file:
-    Key_path = os.path.join(TEMP_FOLDER, Key_file.name)
-    with open(Key_path, "wb") as f:
-        f.write(Key_file.getbuffer())
-
-    # Now that the file exists, set the environment variable
-    os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = Key_path
-    st.success(f"✅ Key file saved and environment variable set!")
+    try:
+        Key_info = json.loads(Key_file.getvalue())
+        st.success(f"✅ Key file loaded for this session!")
+    except ValueError:
+        st.error("❌ Key file is not valid JSON.")
 
 # File uploaders
 Service_file = st.file_uploader("📂 Upload Service Code File", type=["xlsx"])
@@ -41,105 +62,45 @@ Service_path = None
 salesforce_path = None
 sf_conn= None
 
+# ProductCodes of an upload, or None if the file has no ProductCode column;
+# the path is unique per upload so it is safe to cache
+@st.cache_data
+def read_product_codes(path):
+    df = pd.read_excel(path, dtype={"ProductCode": str}, usecols=lambda column: column == "ProductCode")
+    if "ProductCode" not in df.columns:
+        return None
+    return df["ProductCode"].dropna().tolist()
+
+
+# Only re-read the archive when the ServiceCode index changes (index_version)
+@st.cache_data
+def check_archived_product_codes(path, service_index_version):
+    return find_archived_product_codes(read_product_codes(path))
+
+
+archived_codes = None
+
 if Service_file:
-    Service_path = os.path.join(TEMP_FOLDER, Service_file.name)
-    with open(Service_path, "wb") as f:
-        f.write(Service_file.getbuffer())
+    Service_path = save_uploaded_file(Service_file, "service")
     st.success(f"✅ Service code file saved")
 
+    # Check the run archive for ProductCodes that were already loaded, before any push
+    if read_product_codes(Service_path) is None:
+        st.error("❌ The service code file has no 'ProductCode' column.")
+    else:
+        try:
+            archived_codes = check_archived_product_codes(Service_path, index_version("ServiceCode"))
+        except Exception as e:
+            st.warning(f"Could not check the local run archive for duplicates: {e}")
+    if archived_codes is not None and not archived_codes.empty:
+        st.warning("⚠️ Some ProductCodes were already loaded in a previous run:")
+        st.dataframe(archived_codes)
 
-# Your allowed sets
-allowed_sets = {
-    "Unit_of_Measurement__c": [
-        "Each",
-        "Flat",
-        "Bin",
-        "Bulk",
-        "Case",
-        "Combo",
-        "Container",
-        "Dolly",
-        "Drum",
-        "LBs - Gross",
-        "LBs - Net",
-        "Hour",
-        "Hundred Weight Lbs - Gross",
-        "Hundred Weight Lbs - Net",
-        "Kilogram - Gross",
-        "Kilogram - Net",
-        "Hundred Kilogram - Gross",
-        "Hundred Kilogram - Net",
-        "Kilowatt Hour",
-        "Load",
-        "Lot",
-        "Pallet",
-        "Railcar",
-        "Square Foot",
-        "Square Meter",
-        "Tote",
-        "Truck",
-        "Trailer",
-        "Tub",
-        "CWT",
-        "Metric Ton"
-    ],
-    "lcpq_Invoice_Type_Code__c": ["WR", "AN", "RN"],
-    "lcpq_Rebill_Passthrough_Service__c": ["No", "Cost", "Cost + Markup"],
-    "lcpq_Standard_vs_Non_Standard_UOM__c": ["Standard", "Non-Standard"],
-    "lcpq_Service_Code_Categorization__c": [
-        "API Name",
-        "Standard",
-        "Standard, Approval Required",
-        "Legacy",
-    ],
-    "Charge_Break_Flag__c": ["F", "B", "C"],
-    "Charge_Type_Code__c": [
-        "CIO",
-        "DAVM",
-        "DAVS",
-        "DENS",
-        "MAXD",
-        "MAXX",
-        "MULT",
-        "MXCX",
-        "NC",
-        "SING",
-    ],
-    "lcpq_Catalog_Category__c": [
-        "Storage & Handling",
-        "Accessorials",
-        "Storage & Handling for Density",
-        "Boxing Services",
-        "Revenue Override",
-        "Storage & Handling for PNW",
-        "Storage & Handling for Vernon",
-    ],
-    "lcpq_DG_Boxing_Defrost_Language__c": [True, False],
-    "lcpq_Exclude_from_Documents__c": [True, False],
-    "lcpq_Rollup_Category__c": [
-        "Storage",
-        "Handling",
-        "Accessorial",
-        "Blast Freeze",
-        "Case Pick",
-        "Floor Loading",
-        "Floor Unloading",
-        "Shrink Wrap",
-    ],
-    "lcpq_Subcategory__c": [
-        "Accessorial",
-        "Blast Freeze",
-        "Case Pick",
-        "Handling",
-        "Storage",
-    ],
-    "SBQQ__SubscriptionPricing__c": ["Fixed Price"],
-}
 
 def check_service_file(file, output_path):
     error_flag = False
     df = pd.read_excel(file)
-    for column, allowed_values in allowed_sets.items():
+    for column, allowed_values in ALLOWED_SETS.items():
         if column in df.columns:
             invalid_values = set(df[column].unique()) - set(allowed_values)
             if invalid_values:
@@ -160,11 +121,6 @@ def check_service_file(file, output_path):
     return None
 
 if Service_file:
-    Service_path = os.path.join(TEMP_FOLDER, Service_file.name)
-    with open(Service_path, "wb") as f:
-        f.write(Service_file.getbuffer())
-    st.success(f"✅ Service code file saved")
-
     if st.button("✅ Check File for Valid Values"):
         result = check_service_file(Service_path, TEMP_FOLDER)
         if result:
@@ -181,8 +137,17 @@ if Service_file:
 
 
 # Function to retrieve secrets
-def get_secret(secret_id, project_id="selesforce-455620"):
-    client = secretmanager.SecretManagerServiceClient()
+def get_secret(secret_id, project_id="selesforce-455620", key_info=None):
+    # Imported here so users who only validate a file never pay for the
+    # google-cloud/grpc import
+    from google.cloud import secretmanager
+
+    credentials = None
+    if key_info:
+        from google.oauth2 import service_account
+
+        credentials = service_account.Credentials.from_service_account_info(key_info)
+    client = secretmanager.SecretManagerServiceClient(credentials=credentials)
     secret_name = f"projects/{project_id}/secrets/{secret_id}/versions/latest"
 
     response = client.access_secret_version(request={"name": secret_name})
@@ -271,20 +236,29 @@ def Insert_Service_Code(x):
     x_copy["GearsetExternalId__c"] = ""
     Update_Data = []
     data = Formatter_For_Insert(x=x_copy)
+    x_copy["Id"] = None
     results = sf_conn.bulk.Product2.insert(data, batch_size=200)
     for i, result in enumerate(results):
         if result["id"] is not None:
             data[i]["id"] = result["id"]
+            x_copy.at[i, "Id"] = result["id"]
             x_copy.at[i, "GearsetExternalId__c"] = result["id"][::-1]
             data_dict = {"id": result["id"], "GearsetExternalId__c": result["id"][::-1]}
             Update_Data.append(data_dict)
         elif results["message"] is not None:
             st.warning(f"Issue with row{i} error message {results['message']}")
+    Archive_Upload("ServiceCode", x_copy)
     update = sf_conn.bulk.Product2.update(Update_Data, batch_size=200)
     st.success("Service Code Load Complete")
    # Generate the other sheets
-    pricebook_df = Create_Price_Book(data)
-    tariff_df = Create_Tariff_Rate(data)
+    try:
+        pricebook_df = Create_Price_Book(data)
+        tariff_df = Create_Tariff_Rate(data)
+    finally:
+        try:
+            compact_archive()
+        except Exception as e:
+            st.warning(f"Local run archive could not be compacted: {e}")
 
     # Write all DataFrames to one Excel file
     excel_file_path =  os.path.join(TEMP_FOLDER, f"{timestr}Salesforce_Upload.xlsx")
@@ -349,18 +323,23 @@ def Insert_Price_Book(x):
     x_copy["GearsetExternalId__c"] = ""
     Update_Data = []
     data = Formatter_For_Insert(x=x_copy)
+    x_copy["Id"] = None
     results = sf_conn.bulk.PricebookEntry.insert(data, batch_size=200)
     for i, result in enumerate(results):
         data[i]["id"] = result["id"]
+        x_copy.at[i, "Id"] = result["id"]
         x_copy.at[i, "GearsetExternalId__c"] = result["id"][::-1]
         data_dict = {"id": result["id"], "GearsetExternalId__c": result["id"][::-1]}
         Update_Data.append(data_dict)
+    Archive_Upload("PriceBook", x_copy)
     update = sf_conn.bulk.PricebookEntry.update(Update_Data, batch_size=200)
     df = pd.DataFrame(x_copy)
     st.success("PriceBook Load Complete")
     return df
 
 
+
+
 def Create_Tariff_Rate(x):
     Column_header = [
         "lcpq_Facility__c",
@@ -370,222 +349,8 @@ def Create_Tariff_Rate(x):
         "lcpq_Tariff__c",
         "GearsetExternalId__c",
     ]
-    facility = [
-        "a070c000010atetAAA",
-        "a070c0000126ImAAAU",
-        "a07a000000pUc3aAAC",
-        "a07a000000zT7E6AAK",
-        "a074Q000016aPxdQAE",
-        "a07a000000pUc4OAAS",
-        "a070c0000126LjKAAU",
-        "a070c0000126LToAAM",
-        "a070c000012Ld1NAAS",
-        "a070c0000126ImKAAU",
-        "a0730000002ZlFLAA0",
-        "a070c0000126InSAAU",
-        "a074Q000012LdF7QAK",
-        "a074Q00001727N0QAI",
-        "a07a000000zSbkrAAC",
-        "a070c0000126ImjAAE",
-        "a074Q000012DXfCQAW",
-        "a074Q000017265JQAQ",
-        "a07a000000pUc4GAAS",
-        "a070c0000126IpJAAU",
-        "a070c0000126IncAAE",
-        "a070c0000126ImUAAU",
-        "a07a000000pUc4SAAS",
-        "a074Q000018Igm5QAC",
-        "a07a000000pUc4UAAS",
-        "a070c000012Ld1cAAC",
-        "a070c0000126IoGAAU",
-        "a070c0000126In3AAE",
-        "a070c0000126ImeAAE",
-        "a07a000000pUc3vAAC",
-        "a074Q000014jzPWQAY",
-        "a07a000000pUc3kAAC",
-        "a0730000002YvtpAAC",
-        "a07a000000pUc3mAAC",
-        "a074Q000012LdDAQA0",
-        "a07a000000pUc3oAAC",
-        "a070c00000ejkQQAAY",
-        "a073000000TTMnyAAH",
-        "a0730000002Yvu7AAC",
-        "a074Q000014knShQAI",
-        "a074Q000017j71AQAQ",
-        "a07a000000pUc3dAAC",
-        "a074Q000013mvrSQAQ",
-        "a074Q000017jlESQAY",
-        "a0730000002YvtnAAC",
-        "a070c0000126Io1AAE",
-        "a074Q00001A27k4QAB",
-        "a07a000000pUc4HAAS",
-        "a070c0000126ImoAAE",
-        "a074Q000012DXgsQAG",
-        "a07a000000pUc42AAC",
-        "a074Q000013mvrXQAQ",
-        "a070c0000126IofAAE",
-        "a070c0000126Ip9AAE",
-        "a0730000002YvtxAAC",
-        "a070c000011M0WFAA0",
-        "a0730000002YvtwAAC",
-        "a074Q000014n4pHQAQ",
-        "a07a000000zT7DXAA0",
-        "a070c0000126IouAAE",
-        "a0730000002YvtqAAC",
-        "a0730000002YvttAAC",
-        "a0730000002ZlFMAA0",
-        "a07a000000pUc3jAAC",
-        "a074Q000014n4usQAA",
-        "a07a000000pUc3tAAC",
-        "a070c0000126L3uAAE",
-        "a073000000QaciTAAR",
-        "a074Q000014kwKDQAY",
-        "a070c0000126Ip4AAE",
-        "a0730000002YvtyAAC",
-        "a070c0000126Kn8AAE",
-        "a0730000002YvtlAAC",
-        "a074Q000014lTrMQAU",
-        "a070c0000126IopAAE",
-        "a070c000010bJPTAA2",
-        "a070c0000126ImFAAU",
-        "a070c000010bJPOAA2",
-        "a070c0000126ImyAAE",
-        "a07a000000pUc49AAC",
-        "a07a000000pUc4QAAS",
-        "a070c0000126In8AAE",
-        "a074Q000016aGcHQAU",
-        "a07a000000pUc3nAAC",
-        "a07a000000pUc47AAC",
-        "a070c0000126IokAAE",
-        "a0730000002YvtoAAC",
-        "a074Q000017inilQAA",
-        "a070c0000126ImPAAU",
-        "a0730000002Yvu9AAC",
-        "a07a000000pUc44AAC",
-        "a070c0000126ImtAAE",
-        "a0730000002YvtrAAC",
-        "a0730000002Yvu0AAC",
-        "a0730000002YvtmAAC",
-        "a070c0000126Io6AAE",
-        "a0730000002Yvu6AAC",
-        "a0730000002Yvu2AAC",
-        "a074Q000014n4upQAA",
-        "a070c000010b3YkAAI",
-        "a0730000002ZlFRAA0",
-        "a0730000002Yvu3AAC",
-        "a074Q000012DXh7QAG",
-        "a070c0000126InhAAE",
-        "a07a000000qZieYAAS",
-        "a070c0000126IpOAAU",
-        "a0730000002YvtuAAC",
-        "a074Q000014k5yXQAQ",
-        "a07a000000pUc3zAAC",
-        "a070c0000126Im5AAE",
-        "a07a000000pUc3xAAC",
-        "a0730000002YvtsAAC",
-        "a070c0000126IoLAAU",
-        "a074Q00001727NEQAY",
-        "a07a000000pUZCeAAO",
-        "a07a000000pUc4MAAS",
-        "a07a000000pUc3iAAC",
-        "a070c0000126InNAAU",
-        "a074Q00001720opQAA",
-        "a0730000002YvtzAAC",
-        "a070c000012LcNEAA0",
-        "a070c0000126IozAAE",
-        "a074Q000012LdC6QAK",
-        "a070c0000126IoBAAU",
-        "a0730000002Yvu5AAC",
-        "a070c0000126IpEAAU",
-        "a07a000000pUc48AAC",
-        "a070c000012LcNJAA0",
-        "a0730000002ZlFSAA0",
-        "a0730000002ZlFVAA0",
-        "a0730000002YvuAAAS",
-        "a07a000000zT7E1AAK",
-        "a070c0000126ImZAAU",
-        "a07a000000pUc43AAC",
-        "a07a000000pUc4VAAS",
-        "a070c0000126Im0AAE",
-        "a07a000000pUc4CAAS",
-        "a070c0000126IoVAAU",
-        "a074Q000014n4ulQAA",
-        "a070c000010b3TqAAI",
-        "a07a000000pUc3yAAC",
-        "a07a000000pUc40AAC",
-        "a070c0000126LTtAAM",
-        "a074Q00001A27jtQAB",
-        "a07a000000pUc4WAAS",
-        "a07a000000pUc45AAC",
-        "a07a000000pUc4PAAS",
-        "a074Q000014lTrWQAU",
-        "a07a000000zT7ELAA0",
-        "a070c0000126KmyAAE",
-        "a070c0000126IoaAAE",
-        "a07a000000pUc46AAC",
-        "a070c0000126InIAAU",
-        "a07a000000zT7DhAAK",
-        "a07a000000qaIGBAA2",
-        "a070c0000126IpTAAU",
-        "a07a000000qZXLdAAO",
-        "a0730000003II1FAAW",
-        "a0730000002Yvu4AAC",
-        "a07a000000pUc4TAAS",
-        "a07a000000pUc3lAAC",
-        "a070c000010bJPJAA2",
-        "a070c000010bJOQAA2",
-        "a074Q000017ingfQAA",
-        "a074Q000014lTrgQAE",
-        "a074Q000017jnaFQAQ",
-        "a074Q0000171nLnQAI",
-        "a070c000010bJNwAAM",
-        "a070c000010bJO6AAM",
-        "a070c000010bJO1AAM",
-        "a070c000010bJNrAAM",
-        "a074Q000018HmlEQAS",
-        "a074Q000018Hml4QAC",
-        "a074Q000018HmkpQAC",
-        "a074Q000018HmkzQAC",
-        "a074Q000012DXgRQAW",
-        "a074Q000012DXfnQAG",
-        "a074Q00001720p4QAA",
-        "a074Q00001720p5QAA",
-        "a074Q00001720nnQAA",
-        "a074Q00001720nmQAA",
-        "a074Q000012DXfsQAG",
-        "a074Q00001720pTQAQ",
-        "a074Q000012DXhMQAW",
-        "a074Q000012DXhHQAW",
-        "a074Q00001AzOn0QAF",
-        "a074Q00001A27k9QAB",
-        "a074Q00001A27kBQAR",
-        "a074Q00001A27kDQAR",
-        "a074Q000012DXhRQAW",
-        "a074Q000012DXh2QAG",
-        "a074Q000012DXhCQAW",
-        "a074Q00001727N9QAI",
-        "a074Q000012DXgnQAG",
-        "a074Q000012DXgxQAG",
-        "a070c0000126Kn3AAE",
-        "a074Q00001727MfQAI",
-        "a074Q00001727MzQAI",
-        "a07a000000zSbjFAAS",
-        "a070c000012Ld1SAAS",
-        "a070c000012Ld1XAAS",
-        "a074Q000014n4uqQAA",
-        "a074Q00001727JMQAY",
-        "a074Q000013owk2QAA",
-        "a074Q000013owjxQAA",
-        "a070c0000126JRdAAM",
-        "a070c000011M0cSAAS",
-        "a074Q000014kvkZQAQ",
-        "a070c0000126IoQAAU",
-        "a07a000000pUc41AAC",
-        "a07a000000pUc3eAAC",
-        "a07a000000pUc3gAAC",
-    ]
     feature = pd.DataFrame(columns=Column_header)
-    for y in facility:
+    for y in FACILITY_IDS:
         for i, item in enumerate(x):
             feature.loc[len(feature.index)] = [
                 y,
@@ -613,10 +378,21 @@ def Insert_Tariff_Rate(x):
     results = sf_conn.bulk.lcpq_Tariff_Rate_Table__c.insert(data, batch_size=5000)
     for i, result in enumerate(results):
         data[i]["id"] = result["id"]
+    x_copy["Id"] = [d.get("id") for d in data]
+    Archive_Upload("TariffRate", x_copy)
     st.success("Tariff Rate Load Complete")
     df = pd.DataFrame(x_copy)
     return df
 
+def Archive_Upload(object_name, x):
+    # Keep a local, indexed copy of each object's created Ids as soon as its
+    # insert returns, so partially failed runs can still be rolled back
+    run_id = st.session_state.get("run_id", None)
+    try:
+        archive_frame(object_name, x, run_id)
+    except Exception as e:
+        st.warning(f"{object_name} could not be added to the local run archive: {e}")
+
 def Formatter_For_Insert(x):
     data = []
     for row in x.itertuples():
@@ -647,7 +423,7 @@ login_clicked = st.button(
     
 def login_to_salesforce():
     try:
-        secrets = get_secret("Salesforce_Key", "selesforce-455620")
+        secrets = get_secret("Salesforce_Key", "selesforce-455620", key_info=Key_info)
         env_data = secrets.get(environment, {})
         URL = env_data.get("url")
         KEY = env_data.get("key")
@@ -655,6 +431,8 @@ def login_to_salesforce():
         if not (URL and KEY and SECRET):
             st.error(f"⚠️ Missing credentials for {environment}")
         else:
+            from simple_salesforce import Salesforce
+
             sf_conn = Salesforce(
             username=SF_UserName,
             password=SF_Password,
@@ -675,16 +453,50 @@ if login_clicked:
 # Only show “Add to Prod” once we've stored st.session_state.sf
 if "sf" in st.session_state:
     st.write("You are logged in.  Ready to push to Production:")
-    add_clicked = st.button("✅ Add to Prod")
+    push_confirmed = True
+    if archived_codes is not None and not archived_codes.empty:
+        push_confirmed = st.checkbox(
+            "⚠️ Some ProductCodes were already loaded in a previous run. Push anyway?",
+            key=f"confirm_archived_push_{Service_file.file_id}"
+        )
+    add_clicked = st.button("✅ Add to Prod", disabled=not push_confirmed)
     if add_clicked:
         if Service_path is None:
             st.error("Please upload the service file first.")
         else:
             # Read the Excel file into df
             df = pd.read_excel(Service_path,dtype={"ProductCode": str})
+            st.session_state.run_id = new_run_id()
+            st.info(f"Run ID: {st.session_state.run_id}")
             try:
                 st.success(f"Connected to Salesforce")
                 Create_Service_Code(df)
                 st.success("🎉 Service code pushed to Production!")
             except Exception as e:
                 st.error(f"Error during production push: {e}")
+
+
+# 3) RUN ARCHIVE SECTION
+st.title("🗂️ Run Archive Lookup")
+lookup_column = st.selectbox(
+    "Search by",
+    ["ProductCode", "Id", "GearsetExternalId__c"],
+    key="archive_lookup_column"
+)
+lookup_value = st.text_input("🔎 Value", key="archive_lookup_value")
+if lookup_value:
+    try:
+        matches = lookup(lookup_value.strip(), column=lookup_column)
+        if matches.empty:
+            st.info("No archived runs match that value.")
+        else:
+            st.dataframe(matches)
+    except Exception as e:
+        st.warning(f"Could not read the local run archive: {e}")
+
+rollback_run = st.text_input("↩️ Run ID for rollback list (e.g. 20250101_120000_1a2b3c4d)", key="archive_rollback_run")
+if rollback_run:
+    try:
+        st.json(rollback_ids(rollback_run.strip()))
+    except Exception as e:
+        st.warning(f"Could not read the local run archive: {e}")
@@ -0,0 +1,231 @@
+import os
+import shutil
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from time import sleep, strftime, time
+from uuid import uuid4
+
+import pandas as pd
+import pyarrow.dataset as ds
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# Local archive of every Salesforce upload run.
+#
+# Layout (under ARCHIVE_FOLDER):
+#   <Object>/run_date=YYYYMMDD/<run_id>.parquet   full frames per run
+#   index/<Object>/YYYYMMDD.parquet                ProductCode / Id / GearsetExternalId__c index
+#
+# Lookups, duplicate checks and rollback ID lists only read the index, and only
+# the Object/run_date partitions they need. Writers hold index.lock and replace
+# files atomically, so readers never see a partially written file.
+ARCHIVE_FOLDER = os.path.join("temp", "run_archive")
+INDEX_FOLDER = "index"
+LOCK_FILE = "index.lock"
+INDEX_COLUMNS = ["ProductCode", "Id", "GearsetExternalId__c", "Object", "run_id", "run_date"]
+ARCHIVE_OBJECTS = ["ServiceCode", "PriceBook", "TariffRate"]
+PRODUCT_COLUMNS = {
+    "ServiceCode": "ProductCode",
+    "PriceBook": "Product2Id",
+    "TariffRate": "lcpq_Services__c",
+}
+RETENTION_DAYS = 365
+COMPACT_MIN_FILES = 2
+LOCK_TIMEOUT = 60
+
+
+def new_run_id():
+    # Timestamp for readability plus a random suffix so two pushes in the
+    # same second never share a run_id
+    return f"{strftime('%Y%m%d_%H%M%S')}_{uuid4().hex[:8]}"
+
+
+def _index_folder(archive_folder, object_name):
+    return os.path.join(archive_folder, INDEX_FOLDER, object_name)
+
+
+def _index_files(archive_folder, object_name, run_date=None):
+    folder = _index_folder(archive_folder, object_name)
+    if not os.path.isdir(folder):
+        return []
+    names = sorted(f for f in os.listdir(folder) if f.endswith(".parquet") and not f.startswith("."))
+    if run_date is not None:
+        names = [f for f in names if f == f"{run_date}.parquet"]
+    return [os.path.join(folder, f) for f in names]
+
+
+def _partition_path(archive_folder, object_name, run_date):
+    return os.path.join(archive_folder, object_name, f"run_date={run_date}")
+
+
+def _write_parquet(df, path):
+    # Dot-prefixed temporary name so no reader picks up a half written file
+    folder, name = os.path.split(path)
+    tmp_path = os.path.join(folder, f".{name}.{uuid4().hex}.tmp")
+    df.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, path)
+
+
+@contextmanager
+def _index_lock(archive_folder):
+    # OS level lock on index.lock: it is released by the OS if the holder dies,
+    # so there is no stale lock to clean up, and the file itself is never removed
+    os.makedirs(archive_folder, exist_ok=True)
+    lock_path = os.path.join(archive_folder, LOCK_FILE)
+    deadline = time() + LOCK_TIMEOUT
+    with open(lock_path, "a+b") as lock_file:
+        while True:
+            try:
+                if fcntl:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                else:
+                    lock_file.seek(0)
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+                break
+            except OSError:
+                if time() > deadline:
+                    raise TimeoutError(f"Timed out waiting for archive lock {lock_path}")
+                sleep(0.05)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+            else:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _build_index(object_name, df, product_codes, run_id, run_date):
+    index = pd.DataFrame(columns=INDEX_COLUMNS)
+    if df.empty:
+        return index
+    product_column = PRODUCT_COLUMNS[object_name]
+    if product_column == "ProductCode":
+        index["ProductCode"] = df["ProductCode"]
+    else:
+        index["ProductCode"] = df[product_column].map(product_codes)
+    index["Id"] = df["Id"] if "Id" in df.columns else None
+    index["GearsetExternalId__c"] = df["GearsetExternalId__c"] if "GearsetExternalId__c" in df.columns else None
+    index["Object"] = object_name
+    index["run_id"] = run_id
+    index["run_date"] = run_date
+    return index.astype("string")
+
+
+def load_index(objects=ARCHIVE_OBJECTS, run_date=None, row_filter=None, archive_folder=ARCHIVE_FOLDER):
+    # Only the Object/run_date partitions asked for are opened, and the
+    # optional pyarrow filter expression is pushed down into the scan
+    files = [f for object_name in objects for f in _index_files(archive_folder, object_name, run_date)]
+    if not files:
+        return pd.DataFrame(columns=INDEX_COLUMNS, dtype="string")
+    table = ds.dataset(files, format="parquet").to_table(columns=INDEX_COLUMNS, filter=row_filter)
+    return table.to_pandas().astype("string")
+
+
+def index_version(object_name, archive_folder=ARCHIVE_FOLDER):
+    # Changes whenever a partition of the object's index is written or removed;
+    # meant to be used as a cache key
+    return tuple((f, os.stat(f).st_mtime_ns) for f in _index_files(archive_folder, object_name))
+
+
+def archive_frame(object_name, df, run_id, archive_folder=ARCHIVE_FOLDER):
+    # Called as soon as each object's insert returns, so a run that fails part
+    # way through still records the Ids it already created
+    if object_name not in PRODUCT_COLUMNS:
+        raise ValueError(f"Unsupported archive object: {object_name}")
+    run_date = run_id[:8]
+
+    with _index_lock(archive_folder):
+        partition = _partition_path(archive_folder, object_name, run_date)
+        os.makedirs(partition, exist_ok=True)
+        archived = df.astype("string")
+        archived["run_id"] = run_id
+        _write_parquet(archived, os.path.join(partition, f"{run_id}.parquet"))
+
+        # PriceBook and TariffRate rows only carry the Product2 Id, map it back
+        # to ProductCode through this run's ServiceCode rows
+        product_codes = {}
+        if object_name != "ServiceCode":
+            run_products = load_index(
+                ["ServiceCode"], run_date, ds.field("run_id") == run_id, archive_folder
+            )
+            product_codes = dict(zip(run_products["Id"], run_products["ProductCode"]))
+
+        new_index = _build_index(object_name, df, product_codes, run_id, run_date)
+        if new_index.empty:
+            return new_index
+        # Only today's partition of this object's index is rewritten
+        index = pd.concat(
+            [load_index([object_name], run_date, archive_folder=archive_folder), new_index],
+            ignore_index=True,
+        )
+        folder = _index_folder(archive_folder, object_name)
+        os.makedirs(folder, exist_ok=True)
+        _write_parquet(index, os.path.join(folder, f"{run_date}.parquet"))
+    return new_index
+
+
+def lookup(value, column="ProductCode", archive_folder=ARCHIVE_FOLDER):
+    if column not in ["ProductCode", "Id", "GearsetExternalId__c"]:
+        raise ValueError(f"Unsupported lookup column: {column}")
+    index = load_index(row_filter=ds.field(column) == str(value), archive_folder=archive_folder)
+    return index.sort_values(["run_id", "Object"]).reset_index(drop=True)
+
+
+def find_archived_product_codes(product_codes, archive_folder=ARCHIVE_FOLDER):
+    product_codes = [str(code) for code in product_codes]
+    if not product_codes:
+        return pd.DataFrame(columns=["ProductCode", "Id", "run_id"], dtype="string")
+    matches = load_index(
+        ["ServiceCode"], row_filter=ds.field("ProductCode").isin(product_codes), archive_folder=archive_folder
+    )
+    return matches[["ProductCode", "Id", "run_id"]].drop_duplicates().reset_index(drop=True)
+
+
+def rollback_ids(run_id, archive_folder=ARCHIVE_FOLDER):
+    # IDs created by a run, per object, in the order they should be deleted
+    index = load_index(run_date=run_id[:8], row_filter=ds.field("run_id") == run_id, archive_folder=archive_folder)
+    index = index[index["Id"].notna()]
+    return {
+        object_name: index.loc[index["Object"] == object_name, "Id"].tolist()
+        for object_name in reversed(ARCHIVE_OBJECTS)
+    }
+
+
+def compact_archive(retention_days=RETENTION_DAYS, archive_folder=ARCHIVE_FOLDER):
+    # Drop partitions older than the retention window and merge the remaining
+    # per-run files of each partition into a single file
+    cutoff = (datetime.now() - timedelta(days=retention_days)).strftime("%Y%m%d")
+    with _index_lock(archive_folder):
+        for object_name in ARCHIVE_OBJECTS:
+            for path in _index_files(archive_folder, object_name):
+                if os.path.basename(path)[:8] < cutoff:
+                    os.remove(path)
+
+            object_folder = os.path.join(archive_folder, object_name)
+            if not os.path.isdir(object_folder):
+                continue
+            for partition_name in os.listdir(object_folder):
+                partition = os.path.join(object_folder, partition_name)
+                run_date = partition_name.split("=", 1)[-1]
+                if run_date < cutoff:
+                    shutil.rmtree(partition)
+                    continue
+                files = sorted(
+                    f for f in os.listdir(partition) if f.endswith(".parquet") and not f.startswith(".")
+                )
+                if len(files) < COMPACT_MIN_FILES:
+                    continue
+                merged = pd.concat(
+                    [pd.read_parquet(os.path.join(partition, f)) for f in files], ignore_index=True
+                )
+                # The merged file is in place under a new name before any source
+                # is deleted, so a crash can at worst leave duplicates behind
+                _write_parquet(merged, os.path.join(partition, f"compacted_{uuid4().hex}.parquet"))
+                for f in files:
+                    os.remove(os.path.join(partition, f))
@@ -0,0 +1,171 @@
+import os
+from datetime import datetime, timedelta
+
+import pandas as pd
+import pytest
+
+import run_archive
+
+
+def _run_id(days_ago=0, suffix="aaaaaaaa"):
+    run_date = (datetime.now() - timedelta(days=days_ago)).strftime("%Y%m%d")
+    return f"{run_date}_120000_{suffix}"
+
+
+def _service_code(codes, ids):
+    return pd.DataFrame(
+        {
+            "Name": [f"Service {code}" for code in codes],
+            "ProductCode": codes,
+            "GearsetExternalId__c": [i[::-1] if i else "" for i in ids],
+            "Id": ids,
+        }
+    )
+
+
+def _price_book(product_ids, ids):
+    return pd.DataFrame(
+        {
+            "CurrencyIsoCode": ["USD"] * len(ids),
+            "IsActive": [True] * len(ids),
+            "Product2Id": product_ids,
+            "GearsetExternalId__c": [i[::-1] for i in ids],
+            "Id": ids,
+        }
+    )
+
+
+def _tariff_rate(product_ids, ids):
+    return pd.DataFrame(
+        {
+            "lcpq_Facility__c": ["a070c000010atetAAA"] * len(ids),
+            "lcpq_Services__c": product_ids,
+            "lcpq_Tariff__c": [9999] * len(ids),
+            "GearsetExternalId__c": [f"20250101_20251231_{p}" for p in product_ids],
+            "Id": ids,
+        }
+    )
+
+
+@pytest.fixture
+def archive_folder(tmp_path):
+    return str(tmp_path / "run_archive")
+
+
+def _archive_full_run(run_id, archive_folder):
+    run_archive.archive_frame("ServiceCode", _service_code(["SC1", "SC2"], ["p1", "p2"]), run_id, archive_folder)
+    run_archive.archive_frame("PriceBook", _price_book(["p1", "p2"], ["b1", "b2"]), run_id, archive_folder)
+    run_archive.archive_frame("TariffRate", _tariff_rate(["p1", "p2"], ["t1", "t2"]), run_id, archive_folder)
+
+
+def test_lookup_maps_related_objects_to_product_code(archive_folder):
+    run_id = _run_id()
+    _archive_full_run(run_id, archive_folder)
+
+    matches = run_archive.lookup("SC1", archive_folder=archive_folder)
+
+    assert sorted(zip(matches["Object"], matches["Id"])) == [
+        ("PriceBook", "b1"),
+        ("ServiceCode", "p1"),
+        ("TariffRate", "t1"),
+    ]
+    assert set(matches["run_id"]) == {run_id}
+
+
+def test_lookup_by_id_and_external_id(archive_folder):
+    _archive_full_run(_run_id(), archive_folder)
+
+    by_id = run_archive.lookup("b2", column="Id", archive_folder=archive_folder)
+    by_external_id = run_archive.lookup("2p", column="GearsetExternalId__c", archive_folder=archive_folder)
+
+    assert by_id["ProductCode"].tolist() == ["SC2"]
+    assert by_external_id["Id"].tolist() == ["p2"]
+
+
+def test_lookup_rejects_unindexed_column(archive_folder):
+    with pytest.raises(ValueError):
+        run_archive.lookup("x", column="Name", archive_folder=archive_folder)
+
+
+def test_lookup_on_empty_archive(archive_folder):
+    assert run_archive.lookup("SC1", archive_folder=archive_folder).empty
+
+
+def test_find_archived_product_codes_only_returns_service_codes(archive_folder):
+    run_id = _run_id()
+    _archive_full_run(run_id, archive_folder)
+
+    archived = run_archive.find_archived_product_codes(["SC2", "NEW"], archive_folder)
+
+    assert archived.to_dict("records") == [{"ProductCode": "SC2", "Id": "p2", "run_id": run_id}]
+
+
+def test_rollback_ids_are_per_run_in_delete_order(archive_folder):
+    first, second = _run_id(suffix="aaaaaaaa"), _run_id(suffix="bbbbbbbb")
+    _archive_full_run(first, archive_folder)
+    run_archive.archive_frame("ServiceCode", _service_code(["SC3"], ["p3"]), second, archive_folder)
+
+    ids = run_archive.rollback_ids(first, archive_folder)
+
+    assert list(ids) == ["TariffRate", "PriceBook", "ServiceCode"]
+    assert ids == {"TariffRate": ["t1", "t2"], "PriceBook": ["b1", "b2"], "ServiceCode": ["p1", "p2"]}
+    assert run_archive.rollback_ids(second, archive_folder)["ServiceCode"] == ["p3"]
+
+
+def test_rollback_ids_skip_rows_without_id(archive_folder):
+    run_id = _run_id()
+    run_archive.archive_frame("ServiceCode", _service_code(["SC1", "SC2"], ["p1", None]), run_id, archive_folder)
+
+    assert run_archive.rollback_ids(run_id, archive_folder)["ServiceCode"] == ["p1"]
+
+
+def test_run_without_service_code_is_still_archived(archive_folder):
+    run_id = _run_id()
+    run_archive.archive_frame("PriceBook", _price_book(["p9"], ["b9"]), run_id, archive_folder)
+
+    matches = run_archive.lookup("b9", column="Id", archive_folder=archive_folder)
+
+    assert matches["ProductCode"].isna().all()
+    assert run_archive.rollback_ids(run_id, archive_folder) == {
+        "TariffRate": [],
+        "PriceBook": ["b9"],
+        "ServiceCode": [],
+    }
+
+
+def test_index_version_changes_when_service_codes_are_archived(archive_folder):
+    before = run_archive.index_version("ServiceCode", archive_folder)
+    run_archive.archive_frame("ServiceCode", _service_code(["SC1"], ["p1"]), _run_id(), archive_folder)
+
+    assert run_archive.index_version("ServiceCode", archive_folder) != before
+
+
+def test_compact_archive_drops_runs_past_retention(archive_folder):
+    old_run, new_run = _run_id(days_ago=10), _run_id()
+    _archive_full_run(old_run, archive_folder)
+    run_archive.archive_frame("ServiceCode", _service_code(["SC3"], ["p3"]), new_run, archive_folder)
+
+    run_archive.compact_archive(retention_days=5, archive_folder=archive_folder)
+
+    assert run_archive.rollback_ids(old_run, archive_folder) == {
+        "TariffRate": [],
+        "PriceBook": [],
+        "ServiceCode": [],
+    }
+    assert not os.path.exists(os.path.join(archive_folder, "ServiceCode", f"run_date={old_run[:8]}"))
+    assert run_archive.lookup("SC3", archive_folder=archive_folder)["Id"].tolist() == ["p3"]
+
+
+def test_compact_archive_merges_run_files(archive_folder):
+    first, second = _run_id(suffix="aaaaaaaa"), _run_id(suffix="bbbbbbbb")
+    run_archive.archive_frame("ServiceCode", _service_code(["SC1"], ["p1"]), first, archive_folder)
+    run_archive.archive_frame("ServiceCode", _service_code(["SC2"], ["p2"]), second, archive_folder)
+    partition = os.path.join(archive_folder, "ServiceCode", f"run_date={first[:8]}")
+
+    run_archive.compact_archive(archive_folder=archive_folder)
+
+    files = [f for f in os.listdir(partition) if not f.startswith(".")]
+    assert len(files) == 1 and files[0].startswith("compacted_")
+    merged = pd.read_parquet(os.path.join(partition, files[0]))
+    assert sorted(merged["run_id"]) == [first, second]
+    assert sorted(merged["ProductCode"]) == ["SC1", "SC2"]